@@ -1,25 +1,106 @@
 """A circular genome for simulating transposable elements."""
 
 from __future__ import annotations                       # future before everything else
-from typing import (
-    Generic, TypeVar, Iterable,
-    Callable, Protocol
-)
+from typing import Generic, TypeVar
 
-from abc import (
-    # A tag that says that we can't use this class except by specialising it
-    ABC,
-    # A tag that says that this method must be implemented by a child class
-    abstractmethod
-)
+from bisect import bisect_left
+import numpy as np
 
-class Genome(ABC):
-    """Representation of a circular genome."""
+# The bytes used for the nucleotides in the bytearray genomes. Repeating
+# one of them with * builds the whole run as one bytes object.
+EMPTY = b'-'
+ACTIVE = b'A'
+DISABLED = b'x'
+
+# The same nucleotides as ints, which is what the links of
+# LinkedListGenome hold.
+EMPTY_CELL, ACTIVE_CELL, DISABLED_CELL = EMPTY[0], ACTIVE[0], DISABLED[0]
+
+
+class Genome:
+    """
+    Representation of a circular genome.
+
+    The TE operations must be implemented by a child class.
+    """
 
     def __init__(self, n: int):
-        """Create a genome of size n."""    
+        """Create a genome of size n."""
+        self.TE_counter = 0
+        # The TEs are stored as parallel arrays indexed by TE ID: the start
+        # position and the length. TE IDs start at 1, so slot 0 is unused.
+        # The arrays have room for more TEs than TE_counter and grow by
+        # doubling.
+        self._starts = np.zeros(16, dtype=np.int64)
+        self._lengths = np.zeros(16, dtype=np.int64)
+        # IDs of the active TEs; a TE is active exactly when it is in here.
+        # A dict is an ordered set, and since IDs only grow it keeps them
+        # sorted.
+        self._active_ids: dict[int, None] = {}
+        # IDs of the active TEs sorted by their position. Active TEs never
+        # overlap, so at most one of them can contain a given position.
+        # The unused slot 0 is a sentinel with start -1 and length 0 that
+        # sorts before every real TE and never contains a position.
+        self._starts[0] = -1
+        self.active_index: list[int] = [0]
+
+    def _te_start(self, te: int) -> int:
+        """Get the current start position of te."""
+        return self._starts[te]
+
+    def _colliding_te(self, pos: int) -> int | None:
+        """
+        Find the active TE that pos falls inside, if any.
+
+        The only candidate is the active TE with the largest start before
+        pos, so a binary search in the index finds it in O(log k). The
+        sentinel guarantees that there is such a TE, and since its start is
+        below pos, a single comparison tells if pos falls inside it.
+        """
+        te = self.active_index[bisect_left(self.active_index, pos, key=self._te_start) - 1]
+        return te if pos - self._starts[te] < self._lengths[te] else None
+
+    def _grow_te_arrays(self) -> None:
+        """Double the room for TEs in the TE arrays."""
+        self._starts = np.concatenate((self._starts, np.zeros_like(self._starts)))
+        self._lengths = np.concatenate((self._lengths, np.zeros_like(self._lengths)))
+
+    def _add_te(self, pos: int, length: int) -> int:
+        """
+        Register a new active TE at pos and return its ID.
+
+        Every TE positioned at or after pos is moved length nucleotides
+        upwards to make room for it.
+        """
+        # update pos for every TE positioned after the insertion
+        starts = self._starts[1:self.TE_counter+1]
+        starts[starts >= pos] += length
+
+        self.TE_counter += 1
+        if self.TE_counter == len(self._starts):
+            self._grow_te_arrays()
+        self._starts[self.TE_counter] = pos
+        self._lengths[self.TE_counter] = length
+        self._active_ids[self.TE_counter] = None
+        # moving the TEs after pos kept the index sorted
+        i = bisect_left(self.active_index, pos, key=self._te_start)
+        self.active_index.insert(i, self.TE_counter)
+
+        return self.TE_counter
+
+    def _deactivate_te(self, te: int) -> bool:
+        """
+        Mark te as disabled and drop it from the index of active TEs.
+
+        Returns False if te was already disabled.
+        """
+        if te not in self._active_ids:
+            return False
+        del self._active_ids[te]
+        i = bisect_left(self.active_index, self._starts[te], key=self._te_start)
+        del self.active_index[self.active_index.index(te, i)]
+        return True
 
-    @abstractmethod
     def insert_te(self, pos: int, length: int) -> int:
         """
         Insert a new transposable element.
@@ -33,10 +114,9 @@ class Genome(ABC):
 
         Returns a new ID for the transposable element.
         """
-        ...  # not implemented yet
+        raise NotImplementedError
 
 
-    @abstractmethod
     def copy_te(self, te: int, offset: int) -> int | None:
         """
         Copy a transposable element.
@@ -51,9 +131,8 @@ class Genome(ABC):
 
         If te is not active, return None (and do not copy it).
         """
-        ...  # not implemented yet
+        raise NotImplementedError
 
-    @abstractmethod
     def disable_te(self, te: int) -> None:
         """
         Disable a TE.
@@ -62,19 +141,16 @@ class Genome(ABC):
         TEs are already inactive, so there is no need to do anything
         for those.
         """
-        ...  # not implemented yet
+        raise NotImplementedError
 
-    @abstractmethod
     def active_tes(self) -> list[int]:
         """Get the active TE IDs."""
-        ...  # not implemented yet
+        raise NotImplementedError
 
-    @abstractmethod
     def __len__(self) -> int:
         """Get the current length of the genome."""
-        ...  # not implemented yet
+        raise NotImplementedError
 
-    @abstractmethod
     def __str__(self) -> str:
         """
         Return a string representation of the genome.
@@ -87,21 +163,22 @@ class Genome(ABC):
         represented with the character '-', active TEs with 'A', and disabled
         TEs with 'x'.
         """
-        ...  # not implemented yet
+        raise NotImplementedError
 
 
 class ListGenome(Genome):
     """
     Representation of a genome.
 
-    Implements the Genome interface using Python's built-in lists
+    Implements the Genome interface using Python's built-in lists.
+    The nucleotides are kept in a bytearray, a list of bytes with one
+    entry per nucleotide.
     """
 
     def __init__(self, n: int):
         """Create a new genome with length n."""
-        self.genome = ['-']*n
-        self.TE_counter = 0
-        self.TEs = {}
+        super().__init__(n)
+        self.genome = bytearray(EMPTY) * n
 
     def insert_te(self, pos: int, length: int) -> int:
         """
@@ -116,30 +193,15 @@ class ListGenome(Genome):
 
         Returns a new ID for the transposable element.
         """
-        self.TE_counter += 1
-
         # disable existing TE. If it is active it is continuous. 
-        for te in self.TEs:      
-            if self.TEs[te][2] == 'A':                                       # looking at at max all the TEs
-                start = self.TEs[te][0]
-                end = self.TEs[te][0] + self.TEs[te][1]
-                if start < pos and pos < end:                                
-                    self.disable_te(te)
-                    break
+        te = self._colliding_te(pos)                                         # binary search in the active TEs
+        if te is not None:
+            self.disable_te(te)
 
         # update genome with insertion
-        self.genome = self.genome[:pos] + ['A']*length + self.genome[pos:]   # copying list slices to new list runs in O(n+m)
+        self.genome[pos:pos] = ACTIVE * length                               # slice assignment moves the tail in place in O(n+m)
 
-        # update pos for every TE positioned after the insertion
-        for te in self.TEs:
-            start = self.TEs[te][0]
-            if pos <= start:
-                self.TEs[te][0] += length
-
-        # add to dictionary {1 : [pos, length, status}
-        self.TEs[self.TE_counter] = [pos, length, 'A']
-
-        return self.TE_counter
+        return self._add_te(pos, length)
     
 
     def copy_te(self, te: int, offset: int) -> int | None:       
@@ -157,12 +219,11 @@ class ListGenome(Genome):
         If te is not active, return None (and do not copy it).
         """
         # if active                                               
-        if self.TEs[te][2] == 'A':
-            pos = self.TEs[te][0]
-            length = self.TEs[te][1] 
-            return self.insert_te((pos + offset) % len(self.genome), length)      # use modulos to make the genome circular
-
-        else: return None
+        if te not in self._active_ids:
+            return None
+        pos = int(self._starts[te])
+        length = int(self._lengths[te])
+        return self.insert_te((pos + offset) % len(self.genome), length)          # use modulos to make the genome circular
 
     def disable_te(self, te: int) -> None:
         """
@@ -172,17 +233,17 @@ class ListGenome(Genome):
         TEs are already inactive, so there is no need to do anything
         for those.
         """
-        # update dictionary
-        self.TEs[te][2] = 'D'
-        # update genome
-        pos = self.TEs[te][0]
-        length = self.TEs[te][1]
-        self.genome[pos:pos+length] = 'x' * length                                # assigning to list slice in O(m)
+        # update TE status
+        if not self._deactivate_te(te):
+            return
+        # update genome, reading the TE as plain ints once
+        pos = int(self._starts[te])
+        length = int(self._lengths[te])
+        self.genome[pos:pos+length] = DISABLED * length                            # assigning to list slice in O(m)
 
     def active_tes(self) -> list[int]:
         """Get the active TE IDs."""
-        active_list = [te for te in self.TEs if self.TEs[te][2] == 'A']           # list comprehension looking through all items
-        return active_list
+        return list(self._active_ids)                                               # copying the k active IDs in O(k)
 
     def __len__(self) -> int:
         """Current length of the genome."""
@@ -200,9 +261,9 @@ class ListGenome(Genome):
         represented with the character '-', active TEs with 'A', and disabled
         TEs with 'x'.
         """
-        return ''.join(self.genome)
+        return self.genome.decode('ascii')
 
-# I use the doubly linked list implementation and an insert_before and insert_after function
+# I use the doubly linked list implementation and an insert_before function
 """Doubly-linked lists."""
 
 T = TypeVar('T')
@@ -210,6 +271,9 @@ T = TypeVar('T')
 class Link(Generic[T]):
     """Doubly linked link."""
 
+    # no per-link __dict__, just the three fields
+    __slots__ = ('val', 'prev', 'next')
+
     val: T
     prev: Link[T]
     next: Link[T]
@@ -226,17 +290,19 @@ def insert_before(link: Link[T], val: T) -> None:
     new_link.prev.next = new_link
     new_link.next.prev = new_link
 
-def insert_after(link: Link[T], val: T) -> None:
-    """Add a new link containing val after link."""
-    new_link = Link(val, link, link.next)
-    new_link.prev.next = new_link
-    new_link.next.prev = new_link
+# Number of links between the marks LinkedListGenome uses to jump into the list
+MARK_STRIDE = 32
     
 class LinkedListGenome(Genome):
     """
     Representation of a genome.
 
     Implements the Genome interface using linked lists.
+
+    To avoid walking from the head to reach a position, the genome keeps
+    marks: links with a known position, sorted by position and at most
+    about MARK_STRIDE links apart. A position is reached by jumping to the
+    closest mark before it and walking from there.
     """
 
     def __init__(self, n: int):
@@ -253,11 +319,58 @@ class LinkedListGenome(Genome):
         self.head.prev = self.head
         self.head.next = self.head
 
-        for _ in range(n):
-            insert_after(self.head, '-')
+        # The head sits just before position 0, so it is a mark at -1
+        # that no insertion ever moves. The positions are kept in a NumPy
+        # array, so searching and shifting them does not loop in Python.
+        self._mark_pos = np.concatenate(([-1], np.arange(0, n, MARK_STRIDE)))
+
+        # Allocate all n links back to back, so they end up close together
+        # in memory, and then link them up in one pass from the front.
+        links = [Link(EMPTY_CELL, None, None) for _ in range(n)]  # type: ignore
+        head = prev = self.head
+        for link in links:
+            link.prev = prev
+            prev.next = link
+            prev = link
+        prev.next = head
+        head.prev = prev
+        self._marks: list[Link[T]] = [head] + links[::MARK_STRIDE]
+        self._length = n
+
+        # The first link of each TE, indexed by TE ID like the TE arrays.
+        # Nothing is ever inserted inside an active TE without disabling it
+        # first, so an active TE always starts at this link.
+        self._te_links: list[Link[T] | None] = [None]
+
+        super().__init__(n)
+
+    def _link_at(self, pos: int) -> Link[T]:
+        """
+        Get the link at position pos, or the head if pos is the length.
 
-        self.TEs = {}
-        self.TE_counter = 0
+        Walks from the closest mark before pos, adding a mark every
+        MARK_STRIDE links on the way, so the stretch between marks that
+        insertions have widened is split up again.
+        """
+        marks, mark_pos = self._marks, self._mark_pos
+        i = int(mark_pos.searchsorted(pos, 'right')) - 1
+        link, at = marks[i], int(mark_pos[i])
+
+        new_marks: list[Link[T]] = []
+        new_pos: list[int] = []
+        while pos - at > MARK_STRIDE:
+            for _ in range(MARK_STRIDE):
+                link = link.next
+            at += MARK_STRIDE
+            new_marks.append(link)
+            new_pos.append(at)
+        for _ in range(pos - at):
+            link = link.next
+
+        if new_marks:
+            marks[i+1:i+1] = new_marks
+            self._mark_pos = np.insert(mark_pos, i+1, new_pos)
+        return link
 
     def insert_te(self, pos: int, length: int) -> int:
         """
@@ -272,46 +385,31 @@ class LinkedListGenome(Genome):
 
         Returns a new ID for the transposable element.
         """
-        self.TE_counter += 1
-
         # disable existing TE. If it is active it is continuous. 
-        for te in self.TEs:
-            if self.TEs[te][2] == 'A':
-                start = self.TEs[te][0]
-                end = self.TEs[te][0] + self.TEs[te][1]
-                if start < pos and pos < end:         
-                    self.disable_te(te)
-                    break
+        te = self._colliding_te(pos)
+        if te is not None:
+            self.disable_te(te)
         
         # update genome with insertion
-        count = 1
-
-        current = self.head.next
-        # iterator
-        if pos == 0:
-            # insert 'A'*length at pos
-            for _ in range(length):
-                insert_before(current, 'A')
-        else:
-            while current is not self.head:
-                if count == pos:
-                    # insert 'A'*length at pos
-                    for _ in range(length):
-                        insert_after(current, 'A')
-                    break
-                current = current.next
-                count += 1
-        
-        # update pos for every TE positioned after the insertion
-        for te in self.TEs:
-            start = self.TEs[te][0]
-            if pos <= start:
-                self.TEs[te][0] += length
-
-        # add to dictionary {1 : [pos, length, status}
-        self.TEs[self.TE_counter] = [pos, length, 'A']
-
-        return self.TE_counter
+        pos, length = int(pos), int(length)            # plain ints keep the mark arithmetic fast
+        current = self._link_at(pos)
+        new_marks: list[Link[T]] = []
+        for i in range(length):
+            # insert 'A'*length before the link at pos
+            insert_before(current, ACTIVE_CELL)
+            if i % MARK_STRIDE == 0:
+                new_marks.append(current.prev)
+        self._length += length
+
+        # marks at or after pos moved upwards, and the new links get marks
+        mark_pos = self._mark_pos
+        j = int(mark_pos.searchsorted(pos, 'left'))
+        mark_pos[j:] += length
+        self._marks[j:j] = new_marks
+        self._mark_pos = np.insert(mark_pos, j, np.arange(pos, pos + length, MARK_STRIDE))
+
+        self._te_links.append(new_marks[0] if new_marks else None)
+        return self._add_te(pos, length)
 
     def copy_te(self, te: int, offset: int) -> int | None:
         """
@@ -329,13 +427,11 @@ class LinkedListGenome(Genome):
         """
 
         # if active                                               
-        if self.TEs[te][2] == 'A':
-            pos = self.TEs[te][0]
-            length = self.TEs[te][1]
-        
-            return self.insert_te((pos + offset) % len(self), length)      # use modulos to make the genome circular
-
-        else: return None
+        if te not in self._active_ids:
+            return None
+        pos = int(self._starts[te])
+        length = int(self._lengths[te])
+        return self.insert_te((pos + offset) % self._length, length)      # use modulos to make the genome circular
 
 
     def disable_te(self, te: int) -> None:
@@ -346,40 +442,25 @@ class LinkedListGenome(Genome):
         TEs are already inactive, so there is no need to do anything
         for those.
         """
-        # update dictionary
-        self.TEs[te][2] = 'D'
-        # update genome
-        pos = self.TEs[te][0]
-        length = self.TEs[te][1]
-
-        count = 0
-
-        current = self.head.next
-        # iterator
-        while current is not self.head:
-            if count == pos:
-                for _ in range(length):
-                    # change link value to 'x'
-                    current.val = 'x'
-                    current = current.next
-                break
+        # update TE status
+        if not self._deactivate_te(te):
+            return
+        # update genome, starting from the TE's first link
+        length = int(self._lengths[te])
+
+        current = self._te_links[te]
+        for _ in range(length):
+            # change link value to 'x'
+            current.val = DISABLED_CELL
             current = current.next
-            count += 1
 
     def active_tes(self) -> list[int]:
         """Get the active TE IDs."""
-        active_list = [te for te in self.TEs if self.TEs[te][2] == 'A']
-        return active_list
+        return list(self._active_ids)
 
     def __len__(self) -> int:
         """Current length of the genome."""
-        counter = 0
-        current = self.head.next
-        while current is not self.head:
-            current = current.next
-            counter += 1
-
-        return counter
+        return self._length
 
     def __str__(self) -> str:
         """
@@ -395,9 +476,145 @@ class LinkedListGenome(Genome):
         """
         
         """Get string with the elements going in the next direction."""
-        elms: list[str] = []
+        # the links hold the bytes of the characters, so fill a bytearray
+        # of the known length and decode it in one go
+        elms = bytearray(self._length)
         link = self.head.next
-        while link is not self.head:
-            elms.append(str(link.val))
+        for i in range(self._length):
+            elms[i] = link.val
             link = link.next
-        return ''.join(elms)
\ No newline at end of file
+        return elms.decode('ascii')
+
+class GapBufferGenome(Genome):
+    """
+    Representation of a genome.
+
+    Implements the Genome interface using a gap buffer: a bytearray with
+    one byte per nucleotide and a gap of unused bytes at the position of
+    the latest insertion. Inserting at the gap is a plain write, and
+    moving the gap to another position is a single slice copy.
+    """
+
+    def __init__(self, n: int):
+        """Create a new genome with length n."""
+        super().__init__(n)
+        self.buf = bytearray(EMPTY) * n
+        # the gap is buf[gap_start:gap_end]
+        self.gap_start = n
+        self.gap_end = n
+
+    def _move_gap(self, pos: int) -> None:
+        """Move the gap so it starts at position pos."""
+        if pos < self.gap_start:
+            # move the nucleotides between pos and the gap to after the gap
+            size = self.gap_start - pos
+            self.buf[self.gap_end-size:self.gap_end] = self.buf[pos:self.gap_start]
+            self.gap_end -= size
+        elif pos > self.gap_start:
+            # move the nucleotides after the gap up to pos to before the gap
+            size = pos - self.gap_start
+            self.buf[self.gap_start:pos] = self.buf[self.gap_end:self.gap_end+size]
+            self.gap_end += size
+        self.gap_start = pos
+
+    def _grow_gap(self, length: int) -> None:
+        """Make sure the gap has room for length nucleotides."""
+        missing = length - (self.gap_end - self.gap_start)
+        if missing > 0:
+            # at least double the buffer so growing is amortised O(1)
+            extra = max(missing, len(self.buf))
+            self.buf[self.gap_end:self.gap_end] = bytes(extra)
+            self.gap_end += extra
+
+    def insert_te(self, pos: int, length: int) -> int:
+        """
+        Insert a new transposable element.
+
+        Insert a new transposable element at position pos and len
+        nucleotide forward.
+
+        If the TE collides with an existing TE, i.e. genome[pos]
+        already contains TEs, then that TE should be disabled and
+        removed from the set of active TEs.
+
+        Returns a new ID for the transposable element.
+        """
+        # disable existing TE. If it is active it is continuous.
+        te = self._colliding_te(pos)
+        if te is not None:
+            self.disable_te(te)
+
+        # update genome with insertion
+        self._move_gap(pos)
+        self._grow_gap(length)
+        self.buf[pos:pos+length] = ACTIVE * length
+        self.gap_start += length
+
+        return self._add_te(pos, length)
+
+    def copy_te(self, te: int, offset: int) -> int | None:
+        """
+        Copy a transposable element.
+
+        Copy the transposable element te to an offset from its current
+        location.
+
+        The offset can be positive or negative; if positive the te is copied
+        upwards and if negative it is copied downwards. If the offset moves
+        the copy left of index 0 or right of the largest index, it should
+        wrap around, since the genome is circular.
+
+        If te is not active, return None (and do not copy it).
+        """
+        # if active
+        if te not in self._active_ids:
+            return None
+        pos = int(self._starts[te])
+        length = int(self._lengths[te])
+        return self.insert_te((pos + offset) % len(self), length)      # use modulos to make the genome circular
+
+    def disable_te(self, te: int) -> None:
+        """
+        Disable a TE.
+
+        If te is an active TE, then make it inactive. Inactive
+        TEs are already inactive, so there is no need to do anything
+        for those.
+        """
+        # update TE status
+        if not self._deactivate_te(te):
+            return
+        # update genome, reading the TE as plain ints once
+        pos = int(self._starts[te])
+        length = int(self._lengths[te])
+
+        # write the part of the TE before the gap and then the rest after
+        # it. The gap always sits just after the latest insertion, so an
+        # active TE lies entirely on one side of it, but splitting keeps
+        # this correct for any range.
+        before = max(0, min(pos + length, self.gap_start) - pos)
+        self.buf[pos:pos+before] = DISABLED * before
+        after = pos + before + (self.gap_end - self.gap_start)
+        self.buf[after:after+length-before] = DISABLED * (length - before)
+
+    def active_tes(self) -> list[int]:
+        """Get the active TE IDs."""
+        return list(self._active_ids)
+
+    def __len__(self) -> int:
+        """Current length of the genome."""
+        return len(self.buf) - (self.gap_end - self.gap_start)
+
+    def __str__(self) -> str:
+        """
+        Return a string representation of the genome.
+
+        Create a string that represents the genome. By nature, it will be
+        linear, but imagine that the last character is immediately followed
+        by the first.
+
+        The genome should start at position 0. Locations with no TE should be
+        represented with the character '-', active TEs with 'A', and disabled
+        TEs with 'x'.
+        """
+        return (self.buf[:self.gap_start] + self.buf[self.gap_end:]).decode('ascii')
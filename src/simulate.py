@@ -8,7 +8,8 @@ from typing import Type
 from genome import (
     Genome,
     ListGenome,
-    LinkedListGenome
+    LinkedListGenome,
+    GapBufferGenome
 )
 from dataclasses import dataclass
 
@@ -79,7 +80,11 @@ def sim_te(n: int, k: int,
 
 
 if __name__ == '__main__':
+    import platform
     import timeit
+    print("Interpreter:", platform.python_implementation(),
+          platform.python_version())
+
     start_time = timeit.default_timer()
     sim_te(1_000_000, 1000)
     elapsed = timeit.default_timer() - start_time
@@ -89,3 +94,8 @@ if __name__ == '__main__':
     sim_te(1_000_000, 1000, genome_class=LinkedListGenome)
     elapsed = timeit.default_timer() - start_time
     print("Linked lists:", elapsed)
+
+    start_time = timeit.default_timer()
+    sim_te(1_000_000, 1000, genome_class=GapBufferGenome)
+    elapsed = timeit.default_timer() - start_time
+    print("Gap buffer:", elapsed)
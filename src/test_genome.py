@@ -8,7 +8,8 @@
 from genome import (
     Genome,
     ListGenome,
-    LinkedListGenome
+    LinkedListGenome,
+    GapBufferGenome
 )
 from typing import Type
 
@@ -50,12 +51,94 @@ def run_genome_test(genome_class: Type[Genome]) -> None:
         "xxxxxxxxxx-----xxxxxAAAAAAAAAAxxxxx-----"
     assert genome.active_tes() == [2, 5]
 
+    genome.disable_te(1)  # already disabled, so nothing happens
+    assert str(genome) == \
+        "-----xxxxxAAAAAAAAAAxxxxx-----" \
+        "xxxxxxxxxx-----xxxxxAAAAAAAAAAxxxxx-----"
+    assert genome.active_tes() == [2, 5]
+
+
+def run_long_genome_test(genome_class: Type[Genome]) -> None:
+    """Test a Genome implementation on a genome several marks long."""
+    genome = genome_class(200)
+
+    # Insert TE 1, longer than MARK_STRIDE, just after a mark
+    assert 1 == genome.insert_te(33, 63)
+    assert str(genome) == "-" * 33 + "A" * 63 + "-" * 167
+    assert genome.active_tes() == [1]
+
+    # Insert TE 2 in the stretch between marks that TE 1 widened
+    assert 2 == genome.insert_te(120, 40)
+    assert str(genome) == \
+        "-" * 33 + "A" * 63 + "-" * 24 + "A" * 40 + "-" * 143
+    assert genome.active_tes() == [1, 2]
+
+    # Make TE 3 100 to the right of the start of 2
+    assert 3 == genome.copy_te(2, 100)
+    assert str(genome) == \
+        "-" * 33 + "A" * 63 + "-" * 24 + "A" * 40 + \
+        "-" * 60 + "A" * 40 + "-" * 83
+    assert genome.active_tes() == [1, 2, 3]
+
+    # Make TE 4 50 to the left of the start of 1, wrapping around
+    assert 4 == genome.copy_te(1, -50)
+    assert str(genome) == \
+        "-" * 33 + "A" * 63 + "-" * 24 + "A" * 40 + \
+        "-" * 60 + "A" * 40 + "-" * 66 + "A" * 63 + "-" * 17
+    assert genome.active_tes() == [1, 2, 3, 4]
+
+    # Disable 1 but make 5 active
+    assert 5 == genome.insert_te(60, 10)
+    assert str(genome) == \
+        "-" * 33 + "x" * 27 + "A" * 10 + "x" * 36 + "-" * 24 + \
+        "A" * 40 + "-" * 60 + "A" * 40 + "-" * 66 + "A" * 63 + "-" * 17
+    assert genome.active_tes() == [2, 3, 4, 5]
+    assert genome.copy_te(1, 10) is None  # 1 is disabled, so no copy
+
+    # Disable TEs after and before the latest insertion
+    genome.disable_te(3)
+    genome.disable_te(2)
+    assert str(genome) == \
+        "-" * 33 + "x" * 27 + "A" * 10 + "x" * 36 + "-" * 24 + \
+        "x" * 40 + "-" * 60 + "x" * 40 + "-" * 66 + "A" * 63 + "-" * 17
+    assert genome.active_tes() == [4, 5]
+
+    genome.disable_te(4)
+    assert str(genome) == \
+        "-" * 33 + "x" * 27 + "A" * 10 + "x" * 36 + "-" * 24 + \
+        "x" * 40 + "-" * 60 + "x" * 40 + "-" * 66 + "x" * 63 + "-" * 17
+    assert genome.active_tes() == [5]
+
 
 def test_list_genome() -> None:
     """Test that the Python list implementation works."""
     run_genome_test(ListGenome)
+    run_long_genome_test(ListGenome)
 
 
 def test_linked_list_genome() -> None:
     """Test that the linked list implementation works."""
     run_genome_test(LinkedListGenome)
+    run_long_genome_test(LinkedListGenome)
+
+
+def test_gap_buffer_genome() -> None:
+    """Test that the gap buffer implementation works."""
+    run_genome_test(GapBufferGenome)
+    run_long_genome_test(GapBufferGenome)
+
+
+def test_gap_buffer_disable_at_gap() -> None:
+    """Test disabling TEs that end and start exactly at the gap."""
+    genome = GapBufferGenome(10)
+    assert 1 == genome.insert_te(5, 3)
+    # Inserting at the start of 1 leaves the gap between 2 and 1
+    assert 2 == genome.insert_te(5, 2)
+    assert str(genome) == "-----AAAAA-----"
+    assert genome.active_tes() == [1, 2]
+
+    genome.disable_te(1)  # starts right after the gap
+    assert str(genome) == "-----AAxxx-----"
+    genome.disable_te(2)  # ends right before the gap
+    assert str(genome) == "-----xxxxx-----"
+    assert genome.active_tes() == []